@@ -0,0 +1,252 @@
+import os
+import re
+
+import pandas as pd
+import numpy as np
+
+DATE_COLUMN_PATTERN = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+
+# Satellite variables written by batch_extract without a date axis
+STATIC_SATELLITE_VARIABLES = ['slope', 'aspect']
+
+
+def get_date_columns(columns):
+    """
+    Returns the columns of a wide table that hold daily values ('YYYY-MM-DD').
+    """
+    return [col for col in columns if DATE_COLUMN_PATTERN.match(str(col))]
+
+
+def wide_to_long(df, value_name='value', id_columns=None):
+    """
+    Converts a wide table (one column per date) into long form.
+
+    Parameters:
+    - df: pandas DataFrame with identifier columns and 'YYYY-MM-DD' columns
+    - value_name: str, name of the value column in the output
+    - id_columns: list of identifier columns to keep (defaults to all non-date columns except geometry)
+
+    Returns:
+    - long_df: pandas DataFrame with the identifier columns, 'date' and value_name,
+      NaN values dropped
+    """
+    date_columns = get_date_columns(df.columns)
+    if id_columns is None:
+        id_columns = [col for col in df.columns if col not in date_columns and col != 'geometry']
+
+    values = df[date_columns].to_numpy(dtype='float64')
+    n_rows, n_dates = values.shape
+
+    # Vectorized melt: repeat identifiers over dates, tile dates over rows
+    long_df = pd.DataFrame({col: np.repeat(df[col].to_numpy(), n_dates) for col in id_columns})
+    long_df['date'] = np.tile(pd.to_datetime(date_columns).to_numpy(), n_rows)
+    long_df[value_name] = values.ravel()
+
+    return long_df[~np.isnan(long_df[value_name].to_numpy())].reset_index(drop=True)
+
+
+def ismn_to_long(ismn_df, value_name='soil_moisture'):
+    """
+    Converts a wide ISMN daily table (as written by export_gdf or post_processing) into long form.
+    """
+    id_columns = [col for col in ['network', 'station', 'sensor_id', 'sensor_name', 'latitude', 'longitude',
+                                  'depth_from', 'depth_to'] if col in ismn_df.columns]
+    return wide_to_long(ismn_df, value_name=value_name, id_columns=id_columns)
+
+
+def satellite_to_long(sat_df, variable):
+    """
+    Converts a wide satellite table (as written by batch_extract) into long form.
+    """
+    return wide_to_long(sat_df, value_name=variable, id_columns=['network', 'station'])
+
+
+def align_to_ismn(ismn_long, sat_long, variable, tolerance_days=0, direction='nearest'):
+    """
+    Attaches the closest satellite observation to every ISMN observation of the same station.
+
+    Parameters:
+    - ismn_long: long ISMN table from ismn_to_long
+    - sat_long: long satellite table from satellite_to_long
+    - variable: str, satellite value column to attach
+    - tolerance_days: int, maximum distance in days between ISMN and satellite dates
+    - direction: str, one of ['nearest', 'backward', 'forward']
+
+    Returns:
+    - aligned: ismn_long with the columns variable and f'{variable}_lag_days'
+      (satellite date minus ISMN date), NaN where nothing falls within the tolerance
+    """
+    if direction not in ['nearest', 'backward', 'forward']:
+        raise ValueError(f"Direction '{direction}' is not supported. Use 'nearest', 'backward' or 'forward'.")
+
+    lag_column = f'{variable}_lag_days'
+    right = sat_long[['network', 'station', 'date', variable]].rename(columns={'date': '_sat_date'})
+
+    # merge_asof needs both sides sorted on the matching key
+    left = ismn_long.sort_values('date', kind='stable')
+    right = right.sort_values('_sat_date', kind='stable')
+
+    aligned = pd.merge_asof(
+        left, right,
+        left_on='date', right_on='_sat_date',
+        by=['network', 'station'],
+        tolerance=pd.Timedelta(days=tolerance_days),
+        direction=direction,
+    )
+    aligned[lag_column] = (aligned['_sat_date'] - aligned['date']).dt.days
+    return aligned.drop(columns='_sat_date')
+
+
+def iter_aligned_chunks(ismn_csv, satellite_csvs, tolerance_days=0, direction='nearest',
+                        chunk_size=500, dropna=True):
+    """
+    Streams the ISMN-satellite feature table for one network file.
+
+    The ISMN file is read in chunks of chunk_size sensors (rows of the wide table); each
+    satellite file is melted once and filtered to the stations of the current chunk.
+
+    Parameters:
+    - ismn_csv: path to a wide ISMN daily CSV
+    - satellite_csvs: dict {variable: path} of wide satellite CSVs for the same network
+    - tolerance_days: int, maximum distance in days between ISMN and satellite dates
+    - direction: str, one of ['nearest', 'backward', 'forward']
+    - chunk_size: int, number of ISMN rows per chunk
+    - dropna: bool, drop rows without any matched satellite value
+
+    Yields:
+    - chunk: pandas DataFrame in long form, one row per ISMN observation
+    """
+    dynamic_long = {}
+    static_tables = []
+    for variable, path in satellite_csvs.items():
+        # batch_extract writes an empty file when every station failed
+        try:
+            sat_df = pd.read_csv(path)
+            if variable in STATIC_SATELLITE_VARIABLES:
+                static_tables.append(sat_df[['network', 'station', variable]].drop_duplicates(['network', 'station']))
+            else:
+                dynamic_long[variable] = satellite_to_long(sat_df, variable)
+        except (pd.errors.EmptyDataError, pd.errors.ParserError, KeyError) as e:
+            print(f"⚠️ Skipping unreadable satellite file {path}: {e}")
+
+    if not dynamic_long and not static_tables:
+        return
+
+    for ismn_chunk in pd.read_csv(ismn_csv, chunksize=chunk_size, na_values=['', ' ']):
+        chunk = ismn_to_long(ismn_chunk)
+        if chunk.empty:
+            continue
+
+        stations = chunk['station'].unique()
+        for variable, sat_long in dynamic_long.items():
+            sat_chunk = sat_long[sat_long['station'].isin(stations)]
+            chunk = align_to_ismn(chunk, sat_chunk, variable, tolerance_days=tolerance_days, direction=direction)
+
+        if dropna and dynamic_long:
+            chunk = chunk.dropna(subset=list(dynamic_long), how='all')
+
+        for static_df in static_tables:
+            chunk = chunk.merge(static_df, on=['network', 'station'], how='left')
+
+        if not chunk.empty:
+            yield chunk.sort_values(['station', 'date'], kind='stable').reset_index(drop=True)
+
+
+def write_training_table(ismn_csv, satellite_csvs, output_path, tolerance_days=0, direction='nearest',
+                         chunk_size=500, dropna=True):
+    """
+    Writes the ISMN-satellite feature table for one network to CSV, one chunk at a time.
+
+    Returns:
+    - n_rows: int, number of rows written
+    """
+    os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+    tmp_path = f'{output_path}.tmp'
+
+    n_rows = 0
+    columns = None
+    for chunk in iter_aligned_chunks(ismn_csv, satellite_csvs, tolerance_days=tolerance_days,
+                                     direction=direction, chunk_size=chunk_size, dropna=dropna):
+        if columns is None:
+            columns = list(chunk.columns)
+        chunk = chunk.reindex(columns=columns)
+        chunk.to_csv(tmp_path, mode='w' if n_rows == 0 else 'a', header=n_rows == 0,
+                     index=False, date_format='%Y-%m-%d')
+        n_rows += len(chunk)
+
+    if n_rows:
+        os.replace(tmp_path, output_path)
+    return n_rows
+
+
+def build_training_tables(root_dir, variables, output_root=None, stat_folder=os.path.join('mean', 'agg_mean'),
+                          continents=None, tolerance_days=0, direction='nearest', chunk_size=500,
+                          overwrite=False):
+    """
+    Builds one ISMN-satellite training table per continent and network.
+
+    Expects the layout produced by the extraction notebooks:
+    - {root_dir}/{continent}/extracted_data/{stat_folder}/{network}.csv
+    - {root_dir}/satellite_data/{continent}/{variable}/{network}.csv
+
+    Parameters:
+    - root_dir: str, data root containing the continent folders
+    - variables: list of satellite variables to join
+    - output_root: str, defaults to {root_dir}/training_data
+    - stat_folder: str, ISMN statistic folder relative to extracted_data
+    - continents: list of continents to process (defaults to all)
+    - tolerance_days, direction, chunk_size: see iter_aligned_chunks
+    - overwrite: bool, rebuild tables that already exist
+
+    Returns:
+    - summary: dict {output_path: n_rows}
+    """
+    if output_root is None:
+        output_root = os.path.join(root_dir, 'training_data')
+
+    if continents is None:
+        continents = [c for c in sorted(os.listdir(root_dir))
+                      if os.path.isdir(os.path.join(root_dir, c)) and c not in ['satellite_data', 'training_data']]
+
+    summary = {}
+    for continent in continents:
+        input_dir = os.path.join(root_dir, continent, 'extracted_data', stat_folder)
+        if not os.path.isdir(input_dir):
+            continue
+
+        for file_name in sorted(os.listdir(input_dir)):
+            if not file_name.endswith('.csv'):
+                continue
+
+            output_path = os.path.join(output_root, continent, file_name)
+            if os.path.exists(output_path) and not overwrite:
+                print(f"✅ Skipped (already exists): {output_path}")
+                continue
+
+            satellite_csvs = {}
+            for variable in variables:
+                sat_path = os.path.join(root_dir, 'satellite_data', continent, variable, file_name)
+                if os.path.exists(sat_path):
+                    satellite_csvs[variable] = sat_path
+
+            if not satellite_csvs:
+                print(f"⚠️ No satellite data for {continent}/{file_name}. Skipping...")
+                continue
+
+            try:
+                n_rows = write_training_table(os.path.join(input_dir, file_name), satellite_csvs, output_path,
+                                              tolerance_days=tolerance_days, direction=direction,
+                                              chunk_size=chunk_size)
+            except Exception as e:
+                print(f"⚠️ Error building {continent}/{file_name}: {e}")
+                if os.path.exists(f'{output_path}.tmp'):
+                    os.remove(f'{output_path}.tmp')
+                continue
+
+            summary[output_path] = n_rows
+            if n_rows:
+                print(f"✅ Saved {n_rows} rows: {output_path}")
+            else:
+                print(f"⚠️ No matched rows for {continent}/{file_name}. Nothing written.")
+
+    return summary
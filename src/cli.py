@@ -0,0 +1,118 @@
+"""
+Command line entry point for the ISMN pipeline.
+
+Usage:
+    python -m src.cli extract --config config.json [--dry-run]
+    python -m src.cli postprocess --config config.json [--dry-run]
+    python -m src.cli satellite --config config.json [--dry-run]
+    python -m src.cli status --config config.json
+    python -m src.cli serve --config config.json [--port 8765]
+"""
+import argparse
+import json
+import sys
+import time
+
+from src import pipeline
+
+STAGES = {
+    'extract': (pipeline.plan_extract, pipeline.run_extract),
+    'postprocess': (pipeline.plan_postprocess, pipeline.run_postprocess),
+    'satellite': (pipeline.plan_satellite, pipeline.run_satellite),
+}
+
+
+def load_config(path):
+    """
+    Reads a JSON config file (or YAML when the file ends with .yaml/.yml and pyyaml is installed).
+    """
+    if path is None:
+        return pipeline.merge_config({})
+
+    with open(path, 'r', encoding='utf-8') as f:
+        if path.endswith(('.yaml', '.yml')):
+            import yaml
+            user_config = yaml.safe_load(f) or {}
+        else:
+            user_config = json.load(f)
+    return pipeline.merge_config(user_config)
+
+
+def print_plan(stage, tasks):
+    print(f"{stage}: {len(tasks)} pending")
+    for task in tasks:
+        if stage == 'extract':
+            zip_path, network, stat, output_file = task
+            print(f"  {network} [{stat}] -> {output_file}")
+        elif stage == 'postprocess':
+            input_csv, func, out_file = task
+            print(f"  {input_csv} [{func}] -> {out_file}")
+        else:
+            input_csv, variable, output_path, resuming = task
+            print(f"  {input_csv} [{variable}] -> {output_path}{' (resume)' if resuming else ''}")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='ismn', description='ISMN soil moisture extraction pipeline')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    for name, help_text in [('extract', 'Extract daily soil moisture statistics from ISMN zip files'),
+                            ('postprocess', 'Aggregate extracted files by station location'),
+                            ('satellite', 'Extract Sentinel-1/2 and DEM variables for each station')]:
+        sub = subparsers.add_parser(name, help=help_text)
+        sub.add_argument('--config', help='JSON or YAML config file')
+        sub.add_argument('--dry-run', action='store_true', help='List pending work and exit')
+
+    sub = subparsers.add_parser('status', help='Show pending work for every stage')
+    sub.add_argument('--config', help='JSON or YAML config file')
+    sub.add_argument('--verbose', action='store_true', help='List every pending task')
+
+    sub = subparsers.add_parser('serve', help='Serve indexed queries over the outputs on localhost')
+    sub.add_argument('--config', help='JSON or YAML config file')
+    sub.add_argument('--host', help='Defaults to the query section of the config')
+    sub.add_argument('--port', type=int, help='Defaults to the query section of the config')
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    config = load_config(args.config)
+    start = time.perf_counter()
+
+    if args.command == 'status':
+        for stage, (plan, _) in STAGES.items():
+            tasks = plan(config)
+            if args.verbose:
+                print_plan(stage, tasks)
+            else:
+                print(f"{stage}: {len(tasks)} pending")
+        return 0
+
+    if args.command == 'serve':
+        from src.query_service import QueryService, serve
+
+        query_config = config['query']
+        service = QueryService(config['data_root'], cache_size=query_config['cache_size'])
+        n_files, n_series = service.build_index()
+        print(f"Indexed {n_series} series in {n_files} files in {time.perf_counter() - start:.1f}s")
+        serve(service, host=args.host or query_config['host'], port=args.port or query_config['port'])
+        return 0
+
+    plan, run = STAGES[args.command]
+    tasks = plan(config)
+    if args.dry_run or not tasks:
+        print_plan(args.command, tasks)
+        return 0
+
+    summary = run(config, tasks)
+    print(f"\n✅ Run complete in {time.perf_counter() - start:.1f}s.")
+    print("Summary:")
+    for key, val in summary.items():
+        print(f"  {key.title()}: {val}")
+    # Satellite tasks with failed stations end as 'partial' and must fail the run as well
+    return 1 if summary.get('failed') or summary.get('partial') else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,145 @@
+import pandas as pd
+import numpy as np
+
+N_DOY = 366
+
+
+def rolling_mean(values, window, min_periods=1):
+    """
+    Trailing rolling mean along the day axis using cumulative sums.
+
+    Parameters:
+    - values: float array (n_sensors, n_days), NaN for missing days
+    - window: int, window length in days (the current day included)
+    - min_periods: int, minimum number of valid days in the window
+
+    Returns:
+    - means: float array (n_sensors, n_days), NaN where fewer than min_periods values are valid
+    """
+    valid = ~np.isnan(values)
+    n_sensors, n_days = values.shape
+
+    # Prepend a zero column so that window sums are csum[:, end] - csum[:, start]
+    csum = np.zeros((n_sensors, n_days + 1))
+    np.cumsum(np.where(valid, values, 0.0), axis=1, out=csum[:, 1:])
+    ccount = np.zeros((n_sensors, n_days + 1), dtype=np.int64)
+    np.cumsum(valid, axis=1, out=ccount[:, 1:])
+
+    end = np.arange(1, n_days + 1)
+    start = np.maximum(end - window, 0)
+    sums = csum[:, end] - csum[:, start]
+    counts = ccount[:, end] - ccount[:, start]
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        means = sums / counts
+    means[counts < max(min_periods, 1)] = np.nan
+    return means
+
+
+def day_of_year_index(dates):
+    """
+    Returns the 0-based day of year of each date, 29 February mapped to index 59 and
+    later days of non-leap years shifted by one, so every calendar day has a fixed slot.
+    """
+    dates = pd.to_datetime(dates)
+    doy = dates.dayofyear.to_numpy() - 1
+    return np.where(~dates.is_leap_year & (doy >= 59), doy + 1, doy)
+
+
+def circular_window_sum(arr, window):
+    """
+    Centered moving sum over the day-of-year axis, wrapping around the year end.
+    """
+    if window <= 1:
+        return arr
+    half = window // 2
+    padded = np.concatenate([arr[:, -half:], arr, arr[:, :half]], axis=1)
+    csum = np.concatenate([np.zeros((arr.shape[0], 1)), np.cumsum(padded, axis=1)], axis=1)
+    return csum[:, window:window + arr.shape[1]] - csum[:, :arr.shape[1]]
+
+
+def climatology(values, dates, window=31, min_count=3):
+    """
+    Day-of-year climatology of each sensor in a single scatter-add pass.
+
+    Parameters:
+    - values: float array (n_sensors, n_days)
+    - dates: sequence of n_days dates
+    - window: int, centered day-of-year window pooled into each slot (1 for no smoothing)
+    - min_count: int, minimum number of valid values per slot
+
+    Returns:
+    - clim_mean, clim_std: float arrays (n_sensors, 366)
+    """
+    n_sensors, n_days = values.shape
+    valid = ~np.isnan(values)
+    filled = np.where(valid, values, 0.0)
+
+    # Flat (sensor, doy) slot of every cell, accumulated with bincount
+    slots = (np.arange(n_sensors)[:, None] * N_DOY + day_of_year_index(dates)[None, :]).ravel()
+    size = n_sensors * N_DOY
+    sums = np.bincount(slots, weights=filled.ravel(), minlength=size).reshape(n_sensors, N_DOY)
+    sumsq = np.bincount(slots, weights=(filled ** 2).ravel(), minlength=size).reshape(n_sensors, N_DOY)
+    counts = np.bincount(slots, weights=valid.ravel(), minlength=size).reshape(n_sensors, N_DOY)
+
+    sums = circular_window_sum(sums, window)
+    sumsq = circular_window_sum(sumsq, window)
+    counts = circular_window_sum(counts, window)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        clim_mean = sums / counts
+        clim_var = (sumsq - counts * clim_mean ** 2) / (counts - 1)
+    clim_std = np.sqrt(np.clip(clim_var, 0, None))
+
+    insufficient = counts < max(min_count, 2)
+    clim_mean[insufficient] = np.nan
+    clim_std[insufficient] = np.nan
+    return clim_mean, clim_std
+
+
+def standardized_anomaly(values, dates, clim_mean, clim_std):
+    """
+    (value - climatological mean) / climatological std for every sensor and day.
+    """
+    doy = day_of_year_index(dates)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        anomaly = (values - clim_mean[:, doy]) / clim_std[:, doy]
+    anomaly[~np.isfinite(anomaly)] = np.nan
+    return anomaly
+
+
+def compute_sm_features(ts_df, windows=(7, 30), min_periods=None, climatology_window=31, min_count=3):
+    """
+    Derives rolling means, day-of-year climatology and standardized anomalies from the
+    output of get_sm_time_series.
+
+    Parameters:
+    - ts_df: pandas DataFrame (sensors x daily 'YYYY-MM-DD' columns)
+    - windows: rolling window lengths in days
+    - min_periods: int, minimum number of valid days per rolling window
+      (defaults to half of each window, rounded up)
+    - climatology_window: int, see climatology
+    - min_count: int, minimum number of values per climatology slot
+
+    Returns:
+    - features: dict {name: pandas DataFrame}; 'rolling_{w}d' and 'anomaly' have the
+      columns of ts_df, 'climatology_mean' and 'climatology_std' have one column per
+      day of year ('doy_001' ... 'doy_366')
+    """
+    values = ts_df.to_numpy(dtype='float64')
+    dates = pd.to_datetime(ts_df.columns)
+
+    features = {}
+    for window in windows:
+        periods = min_periods if min_periods is not None else (window + 1) // 2
+        features[f'rolling_{window}d'] = pd.DataFrame(rolling_mean(values, window, min_periods=periods),
+                                                      columns=ts_df.columns, index=ts_df.index)
+
+    clim_mean, clim_std = climatology(values, dates, window=climatology_window, min_count=min_count)
+    doy_columns = [f'doy_{d:03d}' for d in range(1, N_DOY + 1)]
+    features['climatology_mean'] = pd.DataFrame(clim_mean, columns=doy_columns, index=ts_df.index)
+    features['climatology_std'] = pd.DataFrame(clim_std, columns=doy_columns, index=ts_df.index)
+    features['anomaly'] = pd.DataFrame(standardized_anomaly(values, dates, clim_mean, clim_std),
+                                       columns=ts_df.columns, index=ts_df.index)
+
+    return features
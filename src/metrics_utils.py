@@ -0,0 +1,176 @@
+import warnings
+
+import pandas as pd
+import numpy as np
+
+SERIES_KEYS = ['network', 'station', 'sensor_id', 'depth_from', 'depth_to']
+METRICS = ['n', 'pearson_r', 'spearman_r', 'bias', 'rmse', 'ubrmse']
+SEASONS = {12: 'DJF', 1: 'DJF', 2: 'DJF', 3: 'MAM', 4: 'MAM', 5: 'MAM',
+           6: 'JJA', 7: 'JJA', 8: 'JJA', 9: 'SON', 10: 'SON', 11: 'SON'}
+
+
+def scatter_mean(flat_index, values, size):
+    """
+    Mean of the non-NaN values falling into each flat cell, NaN for empty cells.
+    """
+    valid = ~np.isnan(values)
+    sums = np.bincount(flat_index, weights=np.where(valid, values, 0.0), minlength=size)
+    counts = np.bincount(flat_index, weights=valid, minlength=size)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return sums / counts
+
+
+def to_matrices(aligned, reference='soil_moisture', target='NDVI'):
+    """
+    Pivots a long aligned table into padded series x date matrices.
+
+    Parameters:
+    - aligned: long table with the series keys, 'date' and both value columns
+      (e.g. the output of alignment_utils.iter_aligned_chunks)
+    - reference: str, in-situ value column
+    - target: str, satellite value column
+
+    Returns:
+    - keys: pandas DataFrame, one row per series
+    - dates: pandas DatetimeIndex of the matrix columns
+    - x, y: float arrays (n_series, n_dates), NaN where a series has no value. Duplicate
+      (series, date) rows are averaged.
+    """
+    key_columns = [col for col in SERIES_KEYS if col in aligned.columns]
+    row_codes = aligned.groupby(key_columns, dropna=False, sort=False).ngroup().to_numpy()
+    col_codes, dates = pd.factorize(pd.to_datetime(aligned['date']), sort=True)
+
+    # First row of every group holds its keys
+    first_rows = np.unique(row_codes, return_index=True)[1]
+    keys = aligned[key_columns].iloc[first_rows].reset_index(drop=True)
+
+    shape = (len(keys), len(dates))
+    flat_index = row_codes * len(dates) + col_codes
+    x = scatter_mean(flat_index, aligned[reference].to_numpy(dtype='float64'), shape[0] * shape[1]).reshape(shape)
+    y = scatter_mean(flat_index, aligned[target].to_numpy(dtype='float64'), shape[0] * shape[1]).reshape(shape)
+
+    return keys, pd.DatetimeIndex(dates), x, y
+
+
+def rank_rows(values):
+    """
+    Average ranks along each row, NaN kept in place.
+    """
+    return pd.DataFrame(values).rank(axis=1, method='average').to_numpy()
+
+
+def pearson_rows(x, y):
+    """
+    Pearson correlation of each row pair; x and y must share the same NaN mask.
+    """
+    xc = x - np.nanmean(x, axis=1, keepdims=True)
+    yc = y - np.nanmean(y, axis=1, keepdims=True)
+    cov = np.nansum(xc * yc, axis=1)
+    denom = np.sqrt(np.nansum(xc ** 2, axis=1) * np.nansum(yc ** 2, axis=1))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return cov / denom
+
+
+def compute_metrics(x, y, min_count=3):
+    """
+    NaN-aware validation metrics for every row of the matrices.
+
+    Only dates where both x (in-situ) and y (satellite) are valid are used. Bias is
+    mean(y - x) and ubRMSE is the RMSE after removing the bias.
+
+    Returns:
+    - metrics: dict {metric: float array (n_series,)}, NaN where fewer than min_count pairs exist
+    """
+    mask = ~np.isnan(x) & ~np.isnan(y)
+    x = np.where(mask, x, np.nan)
+    y = np.where(mask, y, np.nan)
+    n = mask.sum(axis=1)
+
+    # All-NaN rows (no pairs) warn in nanmean; they are masked below
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        diff = y - x
+        bias = np.nanmean(diff, axis=1)
+        rmse = np.sqrt(np.nanmean(diff ** 2, axis=1))
+        ubrmse = np.sqrt(np.clip(rmse ** 2 - bias ** 2, 0, None))
+        pearson_r = pearson_rows(x, y)
+        spearman_r = pearson_rows(rank_rows(x), rank_rows(y))
+
+    metrics = {'n': n, 'pearson_r': pearson_r, 'spearman_r': spearman_r,
+               'bias': bias, 'rmse': rmse, 'ubrmse': ubrmse}
+    too_few = n < min_count
+    for name in METRICS[1:]:
+        metrics[name] = np.where(too_few, np.nan, metrics[name])
+    return metrics
+
+
+def validation_report(aligned, reference='soil_moisture', target='NDVI', breakdowns=('year', 'season'),
+                      min_count=3):
+    """
+    Validation metrics of every series, overall and per year / season.
+
+    Parameters:
+    - aligned: long aligned table (see to_matrices)
+    - reference, target: str, in-situ and satellite value columns
+    - breakdowns: any of ['year', 'season']
+    - min_count: int, minimum number of pairs per metric
+
+    Returns:
+    - report: pandas DataFrame with the series keys, 'period' ('all', '2019', 'JJA', ...)
+      and the METRICS columns
+    """
+    keys, dates, x, y = to_matrices(aligned, reference=reference, target=target)
+
+    periods = {'all': np.ones(len(dates), dtype=bool)}
+    if 'year' in breakdowns:
+        for year in np.unique(dates.year):
+            periods[str(year)] = dates.year == year
+    if 'season' in breakdowns:
+        season = dates.month.map(SEASONS).to_numpy()
+        for name in ['DJF', 'MAM', 'JJA', 'SON']:
+            periods[name] = season == name
+
+    # Breakdowns mask whole date columns, so every period is one vectorized pass
+    reports = []
+    for period, columns in periods.items():
+        if not columns.any():
+            continue
+        metrics = compute_metrics(x[:, columns], y[:, columns], min_count=min_count)
+        report = keys.copy()
+        report['period'] = period
+        for name in METRICS:
+            report[name] = metrics[name]
+        reports.append(report)
+
+    return pd.concat(reports, ignore_index=True)
+
+
+def summarize_report(report, group_by=('network',), metadata=None, period='all'):
+    """
+    Aggregates a validation report by network, depth, land cover or any other column.
+
+    Parameters:
+    - report: output of validation_report
+    - group_by: columns to group on (e.g. ['network', 'depth_from'] or ['landcover'])
+    - metadata: optional pandas DataFrame merged on its shared columns with the report,
+      used for grouping columns that are not part of the report (e.g. land cover per station)
+    - period: str, period of the report to summarize, None for all
+
+    Returns:
+    - summary: pandas DataFrame with the number of series and the median of every metric per group
+    """
+    if period is not None:
+        report = report[report['period'] == period]
+    if metadata is not None:
+        on = [col for col in metadata.columns if col in report.columns]
+        report = report.merge(metadata, on=on, how='left')
+
+    group_by = list(group_by)
+    if period is None:
+        group_by.append('period')
+
+    grouped = report.groupby(group_by, dropna=False)
+    summary = grouped[METRICS[1:]].median()
+    summary.insert(0, 'n_series', grouped['pearson_r'].count())
+    summary.insert(1, 'n_pairs', grouped['n'].sum())
+    return summary.reset_index()
@@ -0,0 +1,385 @@
+"""
+Batch drivers for the extraction, post-processing and satellite stages.
+
+Planning functions only use the standard library so that dry runs and status checks
+start instantly; pandas, geopandas, ismn and ee are imported inside the run functions.
+"""
+import os
+import zipfile
+
+DEFAULT_CONFIG = {
+    'data_root': 'data',
+    'export_format': 'csv',
+    'stat_operators': ['mean', 'max', 'min', 'std', 'median'],
+    'overwrite': False,
+    'log_file': 'ismn_run_log.txt',
+    'postprocess': {
+        'continents': None,
+        'aggregations': {
+            'agg_mean': 'mean',
+            'agg_min': 'min',
+            'agg_max': 'max',
+            'agg_median': 'median',
+            'agg_std': 'std'
+        }
+    },
+    'satellite': {
+        'start_date': '2016-06-01',
+        'end_date': '2025-06-14',
+        'input_folder': os.path.join('mean', 'agg_mean'),
+        'variables': [
+            'NDVI', 'NDWI', 'NBR', 'MSI', 'B5', 'B6', 'B7', 'B8', 'B2', 'B3', 'B4', 'B11', 'B12',
+            'VV_sigma0', 'VH_sigma0', 'VV_sigma0_dB', 'VH_sigma0_dB',
+            'VV_gamma0', 'VH_gamma0', 'VV_gamma0_norm', 'VH_gamma0_norm',
+            'VH_VV_ratio_norm_dB', 'local_incidence_angle',
+            'slope', 'aspect'
+        ],
+        'allow_partial': False
+    },
+    'features': {
+        'stats': ['mean'],
+        'windows': [7, 30],
+        'min_periods': None,
+        'climatology_window': 31,
+        'min_count': 3
+    },
+    'query': {
+        'cache_size': 256,
+        'host': '127.0.0.1',
+        'port': 8765
+    }
+}
+
+# Folders of the data root that do not hold a continent
+NON_CONTINENT_FOLDERS = ['satellite_data', 'training_data']
+
+
+def merge_config(user_config):
+    """
+    Returns DEFAULT_CONFIG updated with the user values (one level deep for the stage sections).
+    """
+    config = {}
+    for key, value in DEFAULT_CONFIG.items():
+        if isinstance(value, dict):
+            config[key] = {**value, **user_config.get(key, {})}
+        else:
+            config[key] = user_config.get(key, value)
+    return config
+
+
+def list_continents(data_root, continents=None):
+    if continents:
+        return list(continents)
+    if not os.path.isdir(data_root):
+        return []
+    return [c for c in sorted(os.listdir(data_root))
+            if os.path.isdir(os.path.join(data_root, c)) and c not in NON_CONTINENT_FOLDERS]
+
+
+def list_zip_networks(zip_path):
+    """
+    Lists the networks of an ISMN download from the zip listing ({network}/{station}/{file}).
+    Unreadable zips (e.g. partial downloads) are reported and yield no networks.
+    """
+    networks = set()
+    try:
+        with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+            names = zip_ref.namelist()
+    except (zipfile.BadZipFile, OSError) as e:
+        print(f"⚠ Skipping unreadable zip {zip_path}: {e}")
+        return []
+
+    for name in names:
+        parts = [p for p in name.replace('\\', '/').split('/') if p]
+        if len(parts) >= 3:
+            networks.add(parts[0])
+    return sorted(networks)
+
+
+def feature_names(config):
+    """
+    Names of the feature outputs written by compute_sm_features for this config.
+    """
+    windows = config['features']['windows']
+    return [f'rolling_{w}d' for w in windows] + ['climatology_mean', 'climatology_std', 'anomaly']
+
+
+def output_exists(output_file, config):
+    return not config['overwrite'] and os.path.exists(f"{output_file}.{config['export_format']}")
+
+
+# ------------------------- PLANNING -------------------------
+
+def plan_extract(config):
+    """
+    Returns the pending (zip_path, network, stat, output_file) tasks, output_file without extension.
+    A task is also planned when the statistic exists but one of its feature outputs is missing.
+    """
+    names = feature_names(config)
+    tasks = []
+    zip_files = []
+    for root, dirs, files in os.walk(config['data_root']):
+        dirs.sort()
+        zip_files.extend(os.path.join(root, f) for f in sorted(files) if f.endswith('.zip'))
+
+    for zip_path in zip_files:
+        base_output_dir = os.path.join(os.path.dirname(zip_path), 'extracted_data')
+        for network in list_zip_networks(zip_path):
+            for stat in config['stat_operators']:
+                output_file = os.path.join(base_output_dir, stat, network)
+                pending = not output_exists(output_file, config)
+                if not pending and stat in config['features']['stats']:
+                    feature_dir = os.path.join(base_output_dir, stat, 'features')
+                    pending = not all(output_exists(os.path.join(feature_dir, name, network), config)
+                                      for name in names)
+                if pending:
+                    tasks.append((zip_path, network, stat, output_file))
+    return tasks
+
+
+def plan_postprocess(config):
+    """
+    Returns the pending (input_csv, func, output_csv) aggregation tasks.
+    """
+    tasks = []
+    aggregations = config['postprocess']['aggregations']
+    for continent in list_continents(config['data_root'], config['postprocess']['continents']):
+        extracted_dir = os.path.join(config['data_root'], continent, 'extracted_data')
+        if not os.path.isdir(extracted_dir):
+            continue
+
+        for folder in sorted(f.path for f in os.scandir(extracted_dir) if f.is_dir()):
+            for file_name in sorted(os.listdir(folder)):
+                if not file_name.endswith('.csv'):
+                    continue
+                for out_folder_name, func in aggregations.items():
+                    out_file = os.path.join(folder, out_folder_name, file_name)
+                    if config['overwrite'] or not os.path.exists(out_file):
+                        tasks.append((os.path.join(folder, file_name), func, out_file))
+    return tasks
+
+
+def plan_satellite(config):
+    """
+    Returns the pending (input_csv, variable, output_csv, resuming) tasks, where resuming
+    tells whether a checkpoint from an interrupted run exists.
+    """
+    tasks = []
+    sat_config = config['satellite']
+    output_root = os.path.join(config['data_root'], 'satellite_data')
+    for continent in list_continents(config['data_root']):
+        input_dir = os.path.join(config['data_root'], continent, 'extracted_data', sat_config['input_folder'])
+        if not os.path.isdir(input_dir):
+            continue
+
+        for file_name in sorted(os.listdir(input_dir)):
+            if not file_name.endswith('.csv'):
+                continue
+            for variable in sat_config['variables']:
+                output_path = os.path.join(output_root, continent, variable, file_name)
+                if not os.path.exists(output_path):
+                    resuming = os.path.exists(f'{output_path}.checkpoint.jsonl')
+                    tasks.append((os.path.join(input_dir, file_name), variable, output_path, resuming))
+    return tasks
+
+
+# ------------------------- RUNNING -------------------------
+
+def write_log(log_file, log, summary):
+    with open(log_file, 'w', encoding='utf-8') as f:
+        for entry in log:
+            f.write(entry + '\n')
+        f.write('\n==== FINAL SUMMARY ====\n')
+        for key, val in summary.items():
+            f.write(f'{key.title()}: {val}\n')
+
+
+def run_extract(config, tasks):
+    """
+    Runs the pending extraction tasks, loading each ISMN zip and each network once.
+    Rolling means, climatology and anomalies are written next to the statistics listed
+    in config['features']['stats'].
+    """
+    import warnings
+    import pandas as pd
+    import geopandas as gpd
+    from shapely.geometry import Point
+    from ismn.interface import ISMN_Interface
+    from src.ismn_utils import get_static, get_sm_time_series, export_gdf
+    from src.feature_utils import compute_sm_features
+    warnings.filterwarnings('ignore')
+
+    feature_config = config['features']
+    log = []
+    summary = {'success': 0, 'skipped': 0, 'failed': 0}
+
+    by_zip = {}
+    for zip_path, network, stat, output_file in tasks:
+        by_zip.setdefault(zip_path, {}).setdefault(network, []).append((stat, output_file))
+
+    for zip_path, networks in by_zip.items():
+        print(f"\n📁 Processing file: {os.path.basename(zip_path)}")
+        try:
+            ismn_data = ISMN_Interface(zip_path, parallel=True)
+        except Exception as e:
+            msg = f"⚠ Failed to load {zip_path}: {e}"
+            print(msg)
+            log.append(msg)
+            summary['failed'] += sum(len(stats) for stats in networks.values())
+            continue
+
+        for network, stats in networks.items():
+            try:
+                sm = ismn_data[network].to_xarray(variable='soil_moisture')
+                if sm is None or len(sm.sensor) == 0:
+                    msg = f"  ✘ No soil moisture for {network}."
+                    print(msg)
+                    log.append(msg)
+                    summary['failed'] += len(stats)
+                    continue
+
+                print(f"  ⏳ Processing {network} with {len(sm.sensor)} sensors...")
+                static_df = get_static(sm)
+                geometry = [Point(xy) for xy in zip(static_df['longitude'], static_df['latitude'])]
+            except Exception as e:
+                msg = f"  ⚠ Error with {network}: {e}"
+                print(msg)
+                log.append(msg)
+                summary['failed'] += len(stats)
+                continue
+
+            for stat, output_file in stats:
+                try:
+                    ts_df = get_sm_time_series(sm, statistic=stat)
+
+                    # Existing statistics are kept; the task then only fills in missing features
+                    if not output_exists(output_file, config):
+                        merged_df = pd.concat([static_df, ts_df], axis=1)
+                        gdf = gpd.GeoDataFrame(merged_df, geometry=geometry, crs='EPSG:4326')
+
+                        os.makedirs(os.path.dirname(output_file), exist_ok=True)
+                        export_gdf(gdf, output_file, file_format=config['export_format'])
+
+                    # Derived features go to {stat}/features/{feature}/{network}
+                    if stat in feature_config['stats']:
+                        features = compute_sm_features(ts_df, windows=feature_config['windows'],
+                                                       min_periods=feature_config['min_periods'],
+                                                       climatology_window=feature_config['climatology_window'],
+                                                       min_count=feature_config['min_count'])
+                        for name, feature_df in features.items():
+                            feature_file = os.path.join(os.path.dirname(output_file), 'features', name, network)
+                            os.makedirs(os.path.dirname(feature_file), exist_ok=True)
+                            feature_gdf = gpd.GeoDataFrame(pd.concat([static_df, feature_df], axis=1),
+                                                           geometry=geometry, crs='EPSG:4326')
+                            export_gdf(feature_gdf, feature_file, file_format=config['export_format'])
+
+                    msg = f"  ✓ Exported: {output_file}"
+                    summary['success'] += 1
+                except Exception as e:
+                    msg = f"  ⚠ Error with {network} - {stat}: {e}"
+                    summary['failed'] += 1
+                print(msg)
+                log.append(msg)
+
+    write_log(config['log_file'], log, summary)
+    return summary
+
+
+def run_postprocess(config, tasks):
+    """
+    Aggregates the sensor rows of each extracted file by station location (latitude, longitude).
+    """
+    import pandas as pd
+
+    summary = {'success': 0, 'skipped': 0, 'failed': 0}
+
+    by_file = {}
+    for input_csv, func, out_file in tasks:
+        by_file.setdefault(input_csv, []).append((func, out_file))
+
+    for file_path, outputs in by_file.items():
+        print(f"  📄 File: {file_path}")
+        try:
+            df = pd.read_csv(file_path, na_values=['', ' '])
+        except Exception as e:
+            print(f"    ❌ Could not read file: {e}")
+            summary['failed'] += len(outputs)
+            continue
+
+        # Column partitioning
+        col_A_to_G = df.columns[:7]
+        col_H_to_N = df.columns[7:14]
+        col_O_onwards_all = df.columns[14:-1]
+        geometry_col = df.columns[-1]
+
+        # Force numeric conversion for later aggregation
+        for col in col_O_onwards_all:
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+        col_O_onwards = [col for col in col_O_onwards_all if pd.api.types.is_numeric_dtype(df[col])]
+
+        # Grouping keys: Latitude, Longitude
+        group_keys = [df.columns[6], df.columns[5]]
+
+        for func, out_file in outputs:
+            agg_dict = {
+                **{col: 'first' for col in col_A_to_G},
+                **{col: 'first' for col in col_H_to_N},
+                **{col: func for col in col_O_onwards},
+                geometry_col: 'first'
+            }
+            try:
+                os.makedirs(os.path.dirname(out_file), exist_ok=True)
+                df_agg = df.groupby(group_keys, as_index=False).agg(agg_dict)
+                df_agg.to_csv(out_file, index=False)
+                print(f"    ✅ Saved {func} to: {out_file}")
+                summary['success'] += 1
+            except Exception as e:
+                print(f"    ❌ Error during aggregation ({func}): {e}")
+                summary['failed'] += 1
+
+    return summary
+
+
+def run_satellite(config, tasks):
+    """
+    Runs the pending satellite extractions with per-station checkpointing.
+    """
+    import pandas as pd
+    from src.satellite_utils import extract_to_csv
+
+    summary = {'success': 0, 'partial': 0, 'skipped': 0, 'failed': 0}
+
+    # ee.Authenticate() is interactive, so a headless run reports the error instead
+    try:
+        import ee
+        from src.satellite_extractor import SatelliteDataExtractor
+    except ImportError as e:
+        print(f"⚠ Earth Engine API is not installed: {e}")
+        print("  Run `pip install earthengine-api`, then `earthengine authenticate`, and retry.")
+        summary['failed'] = len(tasks)
+        return summary
+
+    try:
+        ee.Initialize()
+    except Exception as e:
+        print(f"⚠ Earth Engine could not be initialised: {e}")
+        print("  Run `earthengine authenticate` once on this machine and retry.")
+        summary['failed'] = len(tasks)
+        return summary
+
+    sat_config = config['satellite']
+    extractor = SatelliteDataExtractor(start_date=sat_config['start_date'], end_date=sat_config['end_date'])
+
+    # Tasks are grouped by input file, so only the current station table is kept in memory
+    current_csv, df = None, None
+    for input_csv, variable, output_path, resuming in tasks:
+        if input_csv != current_csv:
+            current_csv, df = input_csv, pd.read_csv(input_csv)
+
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        print(f"🚀 {'Resuming' if resuming else 'Extracting'} {variable} for {input_csv}")
+        status = extract_to_csv(df, extractor, variable, output_path,
+                                allow_partial=sat_config['allow_partial'])
+        summary[status] += 1
+
+    return summary
@@ -0,0 +1,410 @@
+"""
+Local read service over the extracted ISMN and satellite CSV outputs.
+
+The wide CSVs hold one series per line, so the index stores the byte offset of every
+line together with its identifiers. A time-series query seeks to that line and parses
+only it; bbox queries are answered from the index alone. Parsed series are kept in a
+bounded LRU cache and every query is timed.
+"""
+import csv
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+
+DATE_COLUMN_PATTERN = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+ID_COLUMNS = ['network', 'station', 'sensor_id', 'sensor_name', 'depth_from', 'depth_to']
+INDEX_FILE = 'query_index.json'
+INDEX_VERSION = 1
+# Latencies kept for the percentiles in QueryService.stats
+LATENCY_WINDOW = 10000
+
+
+def split_leading_fields(line, n_fields):
+    """
+    Parses the first n_fields CSV fields of a line without reading the rest of it.
+    """
+    end = 0
+    n_found = 0
+    in_quotes = False
+    while end < len(line) and n_found < n_fields:
+        char = line[end]
+        if char == '"':
+            in_quotes = not in_quotes
+        elif char == ',' and not in_quotes:
+            n_found += 1
+        end += 1
+    return next(csv.reader([line[:end].rstrip(',\r\n')]))[:n_fields]
+
+
+def to_float(value):
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+def describe_file(data_root, path):
+    """
+    Returns (source, continent, product) of an output file from its location, or None if
+    the file is not an extraction output.
+    - {continent}/extracted_data/{product...}/{network}.csv -> ('ismn', continent, 'mean/agg_mean')
+    - satellite_data/{continent}/{variable}/{network}.csv -> ('satellite', continent, 'NDVI')
+    """
+    parts = os.path.relpath(path, data_root).replace('\\', '/').split('/')
+    if len(parts) >= 4 and parts[0] == 'satellite_data':
+        return 'satellite', parts[1], '/'.join(parts[2:-1])
+    if len(parts) >= 4 and parts[1] == 'extracted_data':
+        return 'ismn', parts[0], '/'.join(parts[2:-1])
+    return None
+
+
+def index_file(path):
+    """
+    Reads a wide CSV once and returns its header layout and one entry per line.
+    """
+    entries = []
+    with open(path, 'rb') as f:
+        header = next(csv.reader([f.readline().decode('utf-8')]))
+        date_positions = [i for i, col in enumerate(header) if DATE_COLUMN_PATTERN.match(col)]
+        if not date_positions:
+            return None
+
+        n_lead = date_positions[0]
+        lead_columns = [col.lower() for col in header[:n_lead]]
+        while True:
+            offset = f.tell()
+            line = f.readline()
+            if not line:
+                break
+            if not line.strip():
+                continue
+
+            fields = dict(zip(lead_columns, split_leading_fields(line.decode('utf-8'), n_lead)))
+            entry = {col: fields[col] for col in ID_COLUMNS if col in fields}
+            entry['latitude'] = to_float(fields.get('latitude', ''))
+            entry['longitude'] = to_float(fields.get('longitude', ''))
+            entry['offset'] = offset
+            entries.append(entry)
+
+    return {
+        'dates': [header[i] for i in date_positions],
+        'first_date_column': date_positions[0],
+        'entries': entries
+    }
+
+
+class QueryService:
+    """
+    In-process query API over {data_root}/*/extracted_data and {data_root}/satellite_data.
+
+    Parameters:
+    - data_root: str, data root used by the extraction notebooks and the CLI
+    - cache_size: int, maximum number of parsed series kept in memory
+    - index_path: str, where the index is persisted (defaults to {data_root}/query_index.json)
+    """
+
+    def __init__(self, data_root, cache_size=256, index_path=None):
+        self.data_root = data_root
+        self.cache_size = cache_size
+        self.index_path = index_path or os.path.join(data_root, INDEX_FILE)
+        self.files = {}
+        self.stations = {}
+        self.cache = OrderedDict()
+        self.lock = threading.Lock()
+        self.query_stats = {'queries': 0, 'cache_hits': 0, 'cache_misses': 0,
+                            'latencies_ms': deque(maxlen=LATENCY_WINDOW)}
+
+    # ------------------------- INDEX -------------------------
+
+    def build_index(self):
+        """
+        Indexes every output CSV, reusing the persisted entries of files that did not change.
+
+        Returns:
+        - n_files, n_series: number of indexed files and series
+        """
+        persisted = {}
+        if os.path.exists(self.index_path):
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                stored = json.load(f)
+            if stored.get('version') == INDEX_VERSION:
+                persisted = stored['files']
+
+        files = {}
+        for root, dirs, names in os.walk(self.data_root):
+            dirs.sort()
+            for name in sorted(names):
+                if not name.endswith('.csv'):
+                    continue
+                path = os.path.join(root, name)
+                description = describe_file(self.data_root, path)
+                if description is None:
+                    continue
+
+                stat = os.stat(path)
+                rel_path = os.path.relpath(path, self.data_root)
+                cached = persisted.get(rel_path)
+                if cached and cached['mtime'] == stat.st_mtime and cached['size'] == stat.st_size:
+                    files[rel_path] = cached
+                    continue
+
+                info = self.index_output(rel_path)
+                if info is not None:
+                    files[rel_path] = info
+
+        with open(self.index_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': INDEX_VERSION, 'files': files}, f)
+
+        # Lookup table {(network, station): [(rel_path, entry), ...]} for series queries
+        stations = {}
+        for rel_path, info in files.items():
+            for entry in info['entries']:
+                stations.setdefault((entry.get('network'), entry.get('station')), []).append((rel_path, entry))
+
+        with self.lock:
+            self.files = files
+            self.stations = stations
+            self.cache.clear()
+        return len(files), sum(len(info['entries']) for info in files.values())
+
+    def index_output(self, rel_path):
+        """
+        Indexes one output file; returns None if it is not a wide output or no longer exists.
+        """
+        path = os.path.join(self.data_root, rel_path)
+        description = describe_file(self.data_root, path)
+        if description is None or not os.path.exists(path):
+            return None
+
+        stat = os.stat(path)
+        layout = index_file(path)
+        if layout is None:
+            return None
+        source, continent, product = description
+        network = os.path.splitext(os.path.basename(path))[0]
+        for entry in layout['entries']:
+            entry.setdefault('network', network)
+        return {'mtime': stat.st_mtime, 'size': stat.st_size, 'source': source,
+                'continent': continent, 'product': product, **layout}
+
+    def is_stale(self, rel_path):
+        """
+        True when the file changed on disk (or disappeared) since it was indexed.
+        """
+        info = self.files.get(rel_path)
+        try:
+            stat = os.stat(os.path.join(self.data_root, rel_path))
+        except OSError:
+            return True
+        return info is None or stat.st_mtime != info['mtime'] or stat.st_size != info['size']
+
+    def refresh_file(self, rel_path):
+        """
+        Re-indexes a file rewritten after build_index and drops its cached series.
+        """
+        info = self.index_output(rel_path)
+        with self.lock:
+            for key in [k for k in self.cache if k[0] == rel_path]:
+                del self.cache[key]
+            for station_key in list(self.stations):
+                kept = [item for item in self.stations[station_key] if item[0] != rel_path]
+                if kept:
+                    self.stations[station_key] = kept
+                else:
+                    del self.stations[station_key]
+
+            if info is None:
+                self.files.pop(rel_path, None)
+                return
+            self.files[rel_path] = info
+            for entry in info['entries']:
+                self.stations.setdefault((entry.get('network'), entry.get('station')), []).append((rel_path, entry))
+
+    def iter_entries(self, source=None, product=None, continent=None):
+        for rel_path, info in self.files.items():
+            if source is not None and info['source'] != source:
+                continue
+            if product is not None and info['product'] != product:
+                continue
+            if continent is not None and info['continent'] != continent:
+                continue
+            for entry in info['entries']:
+                yield rel_path, info, entry
+
+    # ------------------------- QUERIES -------------------------
+
+    def read_series(self, rel_path, offset):
+        """
+        Returns the values of one line as a list (None for missing days), through the LRU cache.
+        """
+        key = (rel_path, offset)
+        with self.lock:
+            if key in self.cache:
+                self.cache.move_to_end(key)
+                self.query_stats['cache_hits'] += 1
+                return self.cache[key]
+            self.query_stats['cache_misses'] += 1
+
+        info = self.files[rel_path]
+        with open(os.path.join(self.data_root, rel_path), 'rb') as f:
+            f.seek(offset)
+            fields = next(csv.reader([f.readline().decode('utf-8')]))
+        start = info['first_date_column']
+        values = [to_float(v) if v else None for v in fields[start:start + len(info['dates'])]]
+
+        with self.lock:
+            self.cache[key] = values
+            self.cache.move_to_end(key)
+            while len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+        return values
+
+    def timed(self, response, start):
+        latency_ms = (time.perf_counter() - start) * 1000
+        with self.lock:
+            self.query_stats['queries'] += 1
+            self.query_stats['latencies_ms'].append(latency_ms)
+        response['latency_ms'] = round(latency_ms, 3)
+        return response
+
+    def series(self, network, station, sensor=None, depth=None, source=None, product=None,
+               start_date=None, end_date=None):
+        """
+        Time series of one station.
+
+        Parameters:
+        - network, station: str
+        - sensor: str, optional sensor_name or sensor_id
+        - depth: float, optional depth_from in m
+        - source: str, 'ismn' or 'satellite'
+        - product: str, e.g. 'mean', 'mean/agg_mean', 'mean/features/anomaly' or 'NDVI'
+        - start_date, end_date: str, 'YYYY-MM-DD' bounds (inclusive)
+
+        Returns:
+        - dict with 'results' (one item per matching series: identifiers, 'dates', 'values')
+          and 'latency_ms'
+        """
+        start = time.perf_counter()
+
+        # Outputs rewritten in place (overwrite, feature back-fill) would shift the byte offsets
+        for rel_path in {rel_path for rel_path, _ in self.stations.get((network, station), [])}:
+            if self.is_stale(rel_path):
+                self.refresh_file(rel_path)
+
+        results = []
+        for rel_path, entry in self.stations.get((network, station), []):
+            info = self.files[rel_path]
+            if source is not None and info['source'] != source:
+                continue
+            if product is not None and info['product'] != product:
+                continue
+            if sensor is not None and str(sensor) not in (entry.get('sensor_name'), entry.get('sensor_id')):
+                continue
+            if depth is not None and to_float(entry.get('depth_from', '')) != float(depth):
+                continue
+
+            values = self.read_series(rel_path, entry['offset'])
+            pairs = [(d, v) for d, v in zip(info['dates'], values)
+                     if (start_date is None or d >= start_date) and (end_date is None or d <= end_date)]
+            results.append({
+                **{k: v for k, v in entry.items() if k != 'offset'},
+                'source': info['source'], 'continent': info['continent'], 'product': info['product'],
+                'dates': [d for d, _ in pairs],
+                'values': [v for _, v in pairs]
+            })
+        return self.timed({'results': results}, start)
+
+    def bbox(self, min_lon, min_lat, max_lon, max_lat, source=None, product=None):
+        """
+        Series whose station lies within the bounding box, answered from the index only.
+
+        Returns:
+        - dict with 'results' (identifiers and location of each series, no values) and 'latency_ms'
+        """
+        start = time.perf_counter()
+        results = []
+        for rel_path, info, entry in self.iter_entries(source=source, product=product):
+            lat, lon = entry.get('latitude'), entry.get('longitude')
+            if lat is None or lon is None:
+                continue
+            if min_lon <= lon <= max_lon and min_lat <= lat <= max_lat:
+                results.append({**{k: v for k, v in entry.items() if k != 'offset'},
+                                'source': info['source'], 'continent': info['continent'],
+                                'product': info['product']})
+        return self.timed({'results': results}, start)
+
+    def stats(self):
+        """
+        Query count, cache usage and latency percentiles (ms) over the last LATENCY_WINDOW queries.
+        """
+        with self.lock:
+            latencies = sorted(self.query_stats['latencies_ms'])
+            summary = {k: v for k, v in self.query_stats.items() if k != 'latencies_ms'}
+            summary['cache_size'] = len(self.cache)
+        summary['n_files'] = len(self.files)
+        if latencies:
+            summary['latency_ms'] = {
+                'mean': sum(latencies) / len(latencies),
+                'p50': latencies[len(latencies) // 2],
+                'p95': latencies[min(int(len(latencies) * 0.95), len(latencies) - 1)],
+                'max': latencies[-1]
+            }
+        return summary
+
+
+# ------------------------- HTTP -------------------------
+
+def serve(service, host='127.0.0.1', port=8765):
+    """
+    Serves the query API as JSON over HTTP:
+    - /series?network=...&station=...[&sensor=&depth=&source=&product=&start_date=&end_date=]
+    - /bbox?min_lon=...&min_lat=...&max_lon=...&max_lat=...[&source=&product=]
+    - /stats
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from urllib.parse import urlparse, parse_qs
+
+    class Handler(BaseHTTPRequestHandler):
+        def send_json(self, status, payload):
+            body = json.dumps(payload).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            params = {k: v[0] for k, v in parse_qs(url.query).items()}
+            try:
+                if url.path == '/series':
+                    payload = service.series(
+                        params.pop('network'), params.pop('station'),
+                        depth=float(params.pop('depth')) if 'depth' in params else None, **params)
+                elif url.path == '/bbox':
+                    coords = [float(params.pop(k)) for k in ['min_lon', 'min_lat', 'max_lon', 'max_lat']]
+                    payload = service.bbox(*coords, **params)
+                elif url.path == '/stats':
+                    payload = service.stats()
+                else:
+                    self.send_json(404, {'error': f'Unknown endpoint: {url.path}'})
+                    return
+            except (KeyError, TypeError, ValueError) as e:
+                self.send_json(400, {'error': f'Invalid query: {e}'})
+                return
+            self.send_json(200, payload)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    print(f"🚀 Serving {service.data_root} on http://{host}:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -0,0 +1,212 @@
+import json
+import os
+
+import pandas as pd
+from tqdm import tqdm
+
+S2_VARIABLES = ['NDVI', 'NDWI', 'NBR', 'MSI', 'B5', 'B6', 'B7', 'B8', 'B2', 'B3', 'B4', 'B11', 'B12']
+S1_VARIABLES = ['VV', 'VH', 'VV_sigma0', 'VH_sigma0', 'VV_sigma0_dB', 'VH_sigma0_dB', 'VV_gamma0', 'VH_gamma0',
+                'VV_gamma0_norm', 'VH_gamma0_norm', 'VH_VV_ratio_norm_dB', 'local_incidence_angle']
+DEM_VARIABLES = ['slope', 'aspect']
+
+
+def station_key(network, station, lat, lon):
+    """
+    Key identifying one station row of an input file.
+    """
+    return str(network), str(station), float(lat), float(lon)
+
+
+class CheckpointStore:
+    """
+    Append-only JSON-lines store of per-station extraction results.
+
+    Every completed station is written as one line and flushed to disk straight away,
+    so a crash loses at most the station in progress. A truncated last line (crash
+    during the write) is ignored on load and cut off before the next append.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def load(self, variable=None):
+        """
+        Returns the stored records, optionally only those of one variable.
+        """
+        records = []
+        if not os.path.exists(self.path):
+            return records
+
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if variable is None or record.get('variable') == variable:
+                    records.append(record)
+        return records
+
+    def truncate_partial_line(self):
+        """
+        Cuts the file back to its last complete line, so a torn write is not glued to the next record.
+        """
+        if not os.path.exists(self.path):
+            return
+
+        with open(self.path, 'rb+') as f:
+            end = f.seek(0, os.SEEK_END)
+            if end == 0:
+                return
+            f.seek(end - 1)
+            if f.read(1) == b'\n':
+                return
+
+            # Scan backwards for the newline ending the last complete record
+            position = end
+            while position > 0:
+                block_start = max(position - 65536, 0)
+                f.seek(block_start)
+                newline = f.read(position - block_start).rfind(b'\n')
+                if newline != -1:
+                    f.truncate(block_start + newline + 1)
+                    return
+                position = block_start
+            f.truncate(0)
+
+    def append(self, record):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        self.truncate_partial_line()
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+    def remove(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def extract_station(extractor, variable, lat, lon):
+    """
+    Runs the extraction backend for one station.
+
+    Returns:
+    - dict with either 'series' ({date: value}) or the DEM values ('slope', 'aspect')
+    """
+    if variable in S2_VARIABLES:
+        dates, values = extractor.extract_sentinel2(lat, lon, variable)
+    elif variable in S1_VARIABLES:
+        dates, values = extractor.extract_sentinel1(lat, lon, band=variable)
+    elif variable in DEM_VARIABLES:
+        slope, aspect = extractor.extract_dem(lat, lon)
+        return {'slope': slope, 'aspect': aspect}
+    else:
+        raise ValueError(f"Variable '{variable}' is not supported.")
+
+    return {'series': dict(zip(dates, values))}
+
+
+def records_to_frame(results):
+    """
+    Builds the wide per-variable table (one column per overpass date) from station records.
+    """
+    date_set = set()
+    for row in results:
+        date_set.update(row.get('series', {}))
+    date_list = sorted(date_set)
+
+    normalized = []
+    for row in results:
+        record = {
+            'network': row['network'],
+            'station': row['station'],
+            'Latitude': row['Latitude'],
+            'Longitude': row['Longitude']
+        }
+        if 'series' not in row:
+            record.update({'slope': row['slope'], 'aspect': row['aspect']})
+        else:
+            series = row['series']
+            record.update({d: float('nan') if series.get(d) is None else series[d] for d in date_list})
+        normalized.append(record)
+
+    return pd.DataFrame(normalized)
+
+
+def batch_extract(df, extractor, variable, checkpoint=None):
+    """
+    Extracts a satellite variable for every station of df.
+
+    Parameters:
+    - df: pandas DataFrame with 'network', 'station', 'latitude', 'longitude' columns
+    - extractor: backend providing extract_sentinel2, extract_sentinel1 and extract_dem
+      (SatelliteDataExtractor, or any object with the same methods)
+    - variable: str, satellite variable to extract
+    - checkpoint: CheckpointStore, optional. Stations already stored are skipped and every
+      new station is appended as soon as it is extracted.
+
+    Returns:
+    - result_df: pandas DataFrame, one row per extracted row of df (in the order of df),
+      one column per date. Duplicate station rows are extracted once and repeated.
+    - n_failed: int, number of stations that raised during extraction
+    """
+    stored = checkpoint.load(variable) if checkpoint is not None else []
+    done = {station_key(r['network'], r['station'], r['Latitude'], r['Longitude']): r for r in stored}
+    row_keys = []
+    n_failed = 0
+
+    for _, row in tqdm(df.iterrows(), total=len(df)):
+        lat, lon, network, station = row['latitude'], row['longitude'], row['network'], row['station']
+        key = station_key(network, station, lat, lon)
+        row_keys.append(key)
+        if key in done:
+            continue
+
+        try:
+            values = extract_station(extractor, variable, lat, lon)
+        except Exception as e:
+            n_failed += 1
+            print(f"Error: {station} → {e}")
+            continue
+
+        record = {'variable': variable, 'network': key[0], 'station': key[1],
+                  'Latitude': key[2], 'Longitude': key[3], **values}
+        if checkpoint is not None:
+            checkpoint.append(record)
+        done[key] = record
+
+    # Rows follow the input file, whatever order the checkpoint was written in
+    results = [done[key] for key in row_keys if key in done]
+    return records_to_frame(results), n_failed
+
+
+def extract_to_csv(df, extractor, variable, output_path, allow_partial=False):
+    """
+    Resumable extraction of one variable for one station file.
+
+    Progress is checkpointed to {output_path}.checkpoint.jsonl. The CSV is assembled from
+    the checkpoint once every station is done (or straight away with allow_partial=True),
+    after which the checkpoint is removed. Re-running after a crash or failures resumes
+    with the missing stations only.
+
+    Returns:
+    - status: str, one of ['success', 'partial', 'skipped']
+    """
+    if os.path.exists(output_path):
+        print(f"✅ Skipped (already exists): {output_path}")
+        return 'skipped'
+
+    checkpoint = CheckpointStore(f'{output_path}.checkpoint.jsonl')
+    result_df, n_failed = batch_extract(df, extractor, variable, checkpoint=checkpoint)
+
+    if n_failed and not allow_partial:
+        print(f"⚠️ {n_failed} stations failed for {variable}; progress kept in {checkpoint.path}")
+        return 'partial'
+
+    tmp_path = f'{output_path}.tmp'
+    result_df.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, output_path)
+    checkpoint.remove()
+    print(f"✅ Saved: {output_path}")
+    return 'success'
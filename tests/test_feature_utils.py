@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+
+from src.feature_utils import climatology, compute_sm_features, rolling_mean
+
+
+def make_values(dates, n_sensors=4, seed=0):
+    rng = np.random.default_rng(seed)
+    values = rng.random((n_sensors, len(dates)))
+    values[rng.random(values.shape) < 0.3] = np.nan
+    values[-1] = np.nan  # sensor without any valid day
+    return values
+
+
+def test_rolling_mean_matches_pandas():
+    dates = pd.date_range('2019-12-01', '2020-03-31')
+    values = make_values(dates)
+
+    for window, min_periods in [(7, 1), (30, 15)]:
+        expected = pd.DataFrame(values.T).rolling(window, min_periods=min_periods).mean().to_numpy().T
+        result = rolling_mean(values, window, min_periods=min_periods)
+        np.testing.assert_allclose(result, expected, equal_nan=True, atol=1e-12)
+
+    assert np.isnan(rolling_mean(values, 7)[-1]).all()
+
+
+def test_climatology_matches_groupby_over_leap_year():
+    dates = pd.date_range('2015-01-01', '2020-12-31')
+    values = make_values(dates)
+    clim_mean, clim_std = climatology(values, dates, window=1, min_count=2)
+
+    # Calendar-day slots: 29 February is index 59, 1 March index 60, 31 December index 365
+    slots = {'02-29': 59, '03-01': 60, '12-31': 365, '01-01': 0}
+    for sensor in range(values.shape[0]):
+        grouped = pd.Series(values[sensor], index=dates.strftime('%m-%d')).groupby(level=0)
+        means, stds, counts = grouped.mean(), grouped.std(), grouped.count()
+        for day, slot in slots.items():
+            if counts[day] < 2:
+                assert np.isnan(clim_mean[sensor, slot]) and np.isnan(clim_std[sensor, slot])
+            else:
+                np.testing.assert_allclose(clim_mean[sensor, slot], means[day], atol=1e-12)
+                np.testing.assert_allclose(clim_std[sensor, slot], stds[day], atol=1e-12)
+
+    assert np.isnan(clim_mean[-1]).all()
+
+
+def test_compute_sm_features_default_min_periods():
+    dates = pd.date_range('2020-01-01', periods=40).strftime('%Y-%m-%d')
+    values = np.full((1, 40), np.nan)
+    values[0, 0] = 0.3
+    features = compute_sm_features(pd.DataFrame(values, columns=dates))
+
+    # A single valid day is enough for neither the 7- nor the 30-day mean
+    assert np.isnan(features['rolling_7d'].to_numpy()).all()
+    assert np.isnan(features['rolling_30d'].to_numpy()).all()
@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.metrics_utils import compute_metrics, to_matrices, validation_report
+
+stats = pytest.importorskip('scipy.stats')
+
+
+def make_aligned(seed=0):
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range('2019-01-01', '2020-12-31')
+    frames = []
+    for sensor_id, station in enumerate(['Banizoumbou', 'Tondikiboro']):
+        sm = rng.random(len(dates)).round(2)
+        sat = 0.5 * sm + rng.normal(0, 0.1, len(dates))
+        sm[rng.random(len(dates)) < 0.2] = np.nan
+        sat[rng.random(len(dates)) < 0.2] = np.nan
+        frames.append(pd.DataFrame({'network': 'AMMA-CATCH', 'station': station, 'sensor_id': sensor_id,
+                                    'depth_from': 0.05, 'depth_to': 0.05, 'date': dates,
+                                    'soil_moisture': sm, 'NDVI': sat}))
+    return pd.concat(frames, ignore_index=True)
+
+
+def test_to_matrices_averages_duplicates():
+    aligned = pd.DataFrame({
+        'network': 'N', 'station': ['a', 'a', 'a', 'b'],
+        'date': pd.to_datetime(['2020-01-02', '2020-01-01', '2020-01-02', '2020-01-01']),
+        'soil_moisture': [0.1, 0.2, 0.3, 0.4],
+        'NDVI': [1.0, 2.0, np.nan, 3.0]
+    })
+    keys, dates, x, y = to_matrices(aligned)
+
+    assert list(keys['station']) == ['a', 'b']
+    assert list(dates.strftime('%Y-%m-%d')) == ['2020-01-01', '2020-01-02']
+    np.testing.assert_allclose(x, [[0.2, 0.2], [0.4, np.nan]])
+    np.testing.assert_allclose(y, [[2.0, 1.0], [3.0, np.nan]])
+
+
+def test_metrics_match_reference():
+    aligned = make_aligned()
+    report = validation_report(aligned, breakdowns=())
+
+    for _, row in report.iterrows():
+        series = aligned[aligned['station'] == row['station']]
+        pairs = series.dropna(subset=['soil_moisture', 'NDVI'])
+        x, y = pairs['soil_moisture'].to_numpy(), pairs['NDVI'].to_numpy()
+        bias = np.mean(y - x)
+        rmse = np.sqrt(np.mean((y - x) ** 2))
+
+        assert row['n'] == len(pairs)
+        np.testing.assert_allclose(row['pearson_r'], stats.pearsonr(x, y)[0], atol=1e-10)
+        np.testing.assert_allclose(row['spearman_r'], stats.spearmanr(x, y)[0], atol=1e-10)
+        np.testing.assert_allclose(row['bias'], bias, atol=1e-12)
+        np.testing.assert_allclose(row['rmse'], rmse, atol=1e-12)
+        np.testing.assert_allclose(row['ubrmse'], np.sqrt(np.mean((y - x - bias) ** 2)), atol=1e-12)
+
+
+def test_metrics_use_joint_mask_and_min_count():
+    x = np.array([[0.1, 0.2, np.nan, 0.4, 0.5], [0.1, np.nan, np.nan, np.nan, 0.2]])
+    y = np.array([[1.0, np.nan, 3.0, 4.0, 6.0], [1.0, 2.0, 3.0, 4.0, 5.0]])
+    metrics = compute_metrics(x, y, min_count=3)
+
+    assert list(metrics['n']) == [3, 2]
+    np.testing.assert_allclose(metrics['pearson_r'][0], stats.pearsonr([0.1, 0.4, 0.5], [1.0, 4.0, 6.0])[0])
+    assert np.isnan([metrics[name][1] for name in ['pearson_r', 'spearman_r', 'bias', 'rmse', 'ubrmse']]).all()
@@ -0,0 +1,32 @@
+import os
+
+import pandas as pd
+
+from src.query_service import QueryService
+
+
+def write_network(path, stations, values):
+    dates = ['2020-01-01', '2020-01-02']
+    df = pd.DataFrame({'network': 'N', 'station': stations, 'latitude': [1.0, 2.0], 'longitude': [1.0, 2.0]})
+    df = pd.concat([df, pd.DataFrame(values, columns=dates)], axis=1)
+    df.to_csv(path, index=False)
+
+
+def test_series_reindexes_rewritten_file(tmp_path):
+    output_dir = tmp_path / 'africa' / 'extracted_data' / 'mean'
+    output_dir.mkdir(parents=True)
+    path = output_dir / 'N.csv'
+    write_network(path, ['B', 'C'], [[0.1, 0.2], [0.3, 0.4]])
+
+    service = QueryService(str(tmp_path))
+    service.build_index()
+    assert service.series('N', 'C')['results'][0]['values'] == [0.3, 0.4]
+
+    # Rewritten in place with another row order and a longer first row
+    write_network(path, ['C', 'B'], [[0.35, 0.45], [0.123456, 0.2]])
+    os.utime(path, (0, 0))
+
+    results = service.series('N', 'C')['results']
+    assert len(results) == 1
+    assert results[0]['values'] == [0.35, 0.45]
+    assert service.series('N', 'B')['results'][0]['values'] == [0.123456, 0.2]
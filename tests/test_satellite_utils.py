@@ -0,0 +1,60 @@
+import os
+
+import pandas as pd
+
+from src.satellite_utils import CheckpointStore, extract_to_csv
+
+
+class FakeExtractor:
+    """
+    Stands in for SatelliteDataExtractor; raises for the stations listed in fail_stations.
+    """
+
+    def __init__(self, fail_stations=()):
+        self.fail_stations = set(fail_stations)
+        self.calls = []
+
+    def extract_sentinel2(self, lat, lon, variable, buffer=250):
+        self.calls.append(lat)
+        if lat in self.fail_stations:
+            raise RuntimeError('User memory limit exceeded.')
+        return ['2020-01-01', '2020-01-11'], [lat / 10, lat / 20]
+
+
+def make_stations():
+    return pd.DataFrame({
+        'network': 'AMMA-CATCH',
+        'station': ['A', 'B', 'C', 'D'],
+        'latitude': [1.0, 2.0, 3.0, 4.0],
+        'longitude': [1.0, 2.0, 3.0, 4.0]
+    })
+
+
+def test_extract_to_csv_resumes_failed_station(tmp_path):
+    df = make_stations()
+    output_path = str(tmp_path / 'NDVI' / 'AMMA-CATCH.csv')
+    checkpoint_path = f'{output_path}.checkpoint.jsonl'
+
+    extractor = FakeExtractor(fail_stations=[3.0])
+    assert extract_to_csv(df, extractor, 'NDVI', output_path) == 'partial'
+    assert not os.path.exists(output_path)
+    assert len(CheckpointStore(checkpoint_path).load('NDVI')) == 3
+
+    extractor = FakeExtractor()
+    assert extract_to_csv(df, extractor, 'NDVI', output_path) == 'success'
+    assert extractor.calls == [3.0]
+    assert not os.path.exists(checkpoint_path)
+
+    result = pd.read_csv(output_path)
+    assert list(result['station']) == ['A', 'B', 'C', 'D']
+    assert list(result['2020-01-01']) == [0.1, 0.2, 0.3, 0.4]
+
+
+def test_checkpoint_ignores_torn_write(tmp_path):
+    store = CheckpointStore(str(tmp_path / 'out.csv.checkpoint.jsonl'))
+    store.append({'variable': 'NDVI', 'station': 'a'})
+    with open(store.path, 'a', encoding='utf-8') as f:
+        f.write('{"variable": "NDVI", "stat')
+
+    store.append({'variable': 'NDVI', 'station': 'b'})
+    assert [r['station'] for r in store.load()] == ['a', 'b']